@@ -13,6 +13,8 @@ Claude APIを使用して、2026年最新Threadsアルゴリズムに最適化
 from __future__ import annotations
  
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import anthropic
 from typing import List, Dict
 from config import PersonaConfig, ThreadsAlgorithmRules, PostTemplate, SCORING_WEIGHTS
@@ -202,15 +204,23 @@ INPUT (draft_post.post_text):
 
         if getattr(self, "enable_two_pass_humanize", True):
             style_modes = self._pick_style_modes(num_variations)
-            humanized: List[Dict] = []
-            for i in range(min(len(posts), num_variations)):
-                try:
-                    humanized.append(self._humanize_post(posts[i], persona, style_modes[i]))
-                except Exception:
-                    logging.exception("ERROR humanize failed at index=%s", i)
-                    p = dict(posts[i])
-                    p["style_mode"] = style_modes[i]
-                    humanized.append(self._ensure_lens(p))
+            n = min(len(posts), num_variations)
+            humanized: List[Dict] = [{} for _ in range(n)]
+            # Humanize は1件ずつ独立したAPI呼び出しなので並列に投げる（順序は index で保持）
+            with ThreadPoolExecutor(max_workers=max(1, min(n, 8))) as executor:
+                futures = {
+                    executor.submit(self._humanize_post, posts[i], persona, style_modes[i]): i
+                    for i in range(n)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        humanized[i] = future.result()
+                    except Exception:
+                        logging.exception("ERROR humanize failed at index=%s", i)
+                        p = dict(posts[i])
+                        p["style_mode"] = style_modes[i]
+                        humanized[i] = self._ensure_lens(p)
             posts = humanized
 
         scored_posts = [self._score_post(p, persona) for p in posts]
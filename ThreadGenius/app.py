@@ -10,25 +10,40 @@ ThreadGenius - メインアプリケーション（Streamlit UI）
 from __future__ import annotations
 
 import base64
-import json
+import hashlib
 import os
-from datetime import datetime
-from typing import Dict, Tuple, Optional, List
-
+import time
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Tuple, Optional, List
+
+import numpy as np
+import orjson
+import pandas as pd
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import (
     PersonaConfig,
     DEFAULT_PERSONAS,
     DEFAULT_RSS_FEEDS,
+    PRESET_NEWS_TEMPLATES,
+    PRESET_TO_CATEGORY,
+    TOPIC_THEME_TO_TAG,
+    TOPIC_THEME_KEYS,
+    TOPIC_THEME_TO_IDX,
     ANTHROPIC_API_KEY,
     THREADS_APP_ID,
     THREADS_APP_SECRET,
 )
-from ai_generator import ThreadsPostGenerator
-from news_collector import NewsCollector
-from threads_api import ThreadsAPIClient
+
+# ai_generator（anthropic）/ news_collector（feedparser）/ threads_api は使う箇所で import する。
+# 初回起動で anthropic の読み込み（約1秒）を待たずに画面を出すため。
+if TYPE_CHECKING:
+    from news_collector import NewsCollector, NewsPoller
+    from threads_api import ThreadsAPIClient
 
 
 # -------------------------
@@ -44,13 +59,113 @@ st.title("🚀 ThreadGenius")
 st.caption("あなた専用 Threads 投稿自動生成ツール（投稿生成 / ペルソナ管理 / Threads連携 / 分析）")
 
 
+# -------------------------
+# HTTP
+# -------------------------
+@st.cache_resource(show_spinner=False)
+def http_session() -> requests.Session:
+    """
+    Threads API 用の HTTP セッション（全リランで共有）。GitHub は _gh_session() を使う。
+    接続を使い回して TLS ハンドシェイクを省く。
+    """
+    s = requests.Session()
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.5),
+        ),
+    )
+    return s
+
+
 # -------------------------
 # GitHub Templates I/O
 # -------------------------
+@st.cache_resource(show_spinner=False)
+def _gh_session() -> requests.Session:
+    """
+    GitHub API 用の keep-alive セッション（マイテンプレ/ペルソナ共通）。
+    429/5xx は指数バックオフ（1s,2s,4s,...）で再試行し、Retry-After があれば従う。
+    403 は権限不足でも返るため再試行せず、呼び出し側でそのまま扱う。
+    """
+    s = requests.Session()
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=1,
+                status_forcelist=(429, 500, 502, 503, 504),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            ),
+        ),
+    )
+    return s
+
+
+def _gh_headers(token: str, raw: bool = False) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.raw+json" if raw else "application/vnd.github+json",
+    }
+
+
+def _git_blob_sha(content: bytes) -> str:
+    """Contents API の sha（= git の blob ハッシュ）を手元で計算する"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def _gh_state() -> Dict:
+    """
+    GitHub 通信の状態（全セッション共有）。
+    etags: url → (ETag, data, sha)。条件付きGETで 304 のとき使い回す（マイテンプレ/ペルソナ共通）。
+    rate_remaining: 直近レスポンスの X-RateLimit-Remaining。
+    failures: url → (期限, 理由)。失敗/未作成を短時間覚えて、リランのたびに叩き直さない。
+    """
+    return {"etags": {}, "rate_remaining": None, "failures": {}}
+
+
+def _note_rate_limit(r: requests.Response) -> None:
+    remaining = r.headers.get("X-RateLimit-Remaining")
+    if remaining is not None and remaining.isdigit():
+        _gh_state()["rate_remaining"] = int(remaining)
+
+
+GH_FAILURE_TTL = 30.0
+GH_NOT_FOUND = "not_found"
+
+
+def _gh_failure(url: str) -> Optional[str]:
+    """GH_FAILURE_TTL 秒以内に記録した失敗理由（なければ None）"""
+    failure = _gh_state()["failures"].get(url)
+    if failure and failure[0] > time.monotonic():
+        return failure[1]
+    return None
+
+
+def _note_gh_failure(url: str, reason: str) -> None:
+    _gh_state()["failures"][url] = (time.monotonic() + GH_FAILURE_TTL, reason)
+
+
+def _describe_request_error(e: Exception) -> str:
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return f"HTTP {e.response.status_code}"
+    return type(e).__name__
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
 def _gh_conf() -> Tuple[str, str, str, str]:
     """
     Streamlit Secrets から GitHub保存設定を読む。
     Secretsが無い場合も落とさない（空文字を返す）。
+    Secrets は実行中に変わらないのでプロセスで1回だけ読む（再読込は _gh_conf.clear()）。
+    app.py はリランごとに読み直されるので functools.lru_cache ではなく cache_resource に置く。
     """
     token = (st.secrets.get("GITHUB_TOKEN", "") or "").strip()
     owner = (st.secrets.get("GITHUB_OWNER", "") or "").strip()
@@ -60,81 +175,111 @@ def _gh_conf() -> Tuple[str, str, str, str]:
 
 
 
-def github_get_file_json() -> Tuple[Dict[str, str], str]:
+def _github_fetch_file_json(token: str, owner: str, repo: str, path: str) -> Optional[Tuple[Dict[str, str], str]]:
     """
     GitHub Contents API から JSON を取得。
+    raw メディアタイプで本文だけを受け取り、sha は本文から計算する。
     戻り: (data_dict, sha)
-    404（未作成）は空dict扱い。
-    取得/デコードに失敗してもアプリを落とさない（空dictで継続）。
+    404（未作成）・JSON でない本文は空dict扱い。
+    通信エラー等で取れなかったときは None（呼び出し側で空扱いにするか決める）。
     """
-    token, owner, repo, path = _gh_conf()
     if not (token and owner and repo and path):
         return {}, ""
 
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    failure = _gh_failure(url)
+    if failure:
+        return ({}, "") if failure == GH_NOT_FOUND else None
+
+    # 前回の ETag があれば条件付きGET（未更新なら 304 で本文なし）
+    etags = _gh_state()["etags"]
+    known = etags.get(url)
+    headers = _gh_headers(token, raw=True)
+    if known:
+        headers = {**headers, "If-None-Match": known[0]}
 
     try:
-        r = requests.get(url, headers=headers, timeout=15)
+        r = _gh_session().get(url, headers=headers, timeout=15)
+        _note_rate_limit(r)
+
+        if r.status_code == 304 and known:
+            return dict(known[1]), known[2]
 
         if r.status_code == 404:
+            etags.pop(url, None)
             return {}, ""
 
         r.raise_for_status()
 
-        # ここが重要：暗黙の decode を避ける
-        payload = json.loads(r.content.decode("utf-8", errors="replace"))
-
-        sha = payload.get("sha", "") or ""
-        content_b64 = payload.get("content", "") or ""
-
-        # GitHub の content は改行を含む場合がある
-        content_b64 = content_b64.replace("\n", "").replace("\r", "")
+        # raw メディアタイプなので本文がファイルそのもの（JSON封筒も base64 もなし）
+        body = r.content
+        sha = _git_blob_sha(body)
 
         try:
-            decoded = base64.b64decode(content_b64).decode("utf-8", errors="replace")
-            data = json.loads(decoded)
+            data = orjson.loads(body)
             if isinstance(data, dict):
                 data = {
                     str(k): str(v)
                     for k, v in data.items()
                     if isinstance(v, str)
                 }
+                etag = r.headers.get("ETag", "")
+                if etag:
+                    etags[url] = (etag, dict(data), sha)
                 return data, sha
-        except Exception:
+        except orjson.JSONDecodeError:
             # content が壊れている/JSONでない場合でも落とさない
             return {}, sha
 
         return {}, sha
 
-    except Exception as e:
-        # 起動を落とさない：UI側で原因を見せたければ st.warning にしてもOK
-        # st.warning(f"GitHubテンプレ取得に失敗: {e}")
-        return {}, ""
-    
+    except (requests.RequestException, ValueError) as e:
+        # 通信/デコードのエラーでも起動を落とさない（理由はサイドバーに出す）
+        _note_gh_failure(url, _describe_request_error(e))
+        return None
+
+
+def github_get_file_json() -> Tuple[Dict[str, str], str]:
+    """
+    マイテンプレを取得。戻り: (data_dict, sha)
+    取れなかったときは例外（空として扱うと保存時に上書きしてしまうため）。
+    """
+    result = _github_fetch_file_json(*_gh_conf())
+    if result is None:
+        raise RuntimeError("GitHub からマイテンプレを取得できませんでした。")
+    return result
+
+
 def _assert_github_secrets_ascii(token: str, owner: str, repo: str, path: str) -> None:
     """
     requests のヘッダは latin-1 制約があり、非ASCII（全角など）が混ざると落ちる。
     その前に検出して、分かりやすいエラーにする。
     """
-    try:
-        (token or "").encode("ascii")
-        (owner or "").encode("ascii")
-        (repo or "").encode("ascii")
-        (path or "").encode("ascii")
-    except UnicodeEncodeError as e:
+    bad = [
+        name
+        for name, value in (("GITHUB_TOKEN", token), ("GITHUB_OWNER", owner), ("GITHUB_REPO", repo), ("path", path))
+        if not (value or "").isascii()
+    ]
+    if bad:
         raise RuntimeError(
             "GitHub Secrets に全角/非ASCII文字が混入しています。"
             "Streamlit Secrets の値を『英数字と記号のみ』に修正してください。"
-            f"（詳細: {e}）"
+            f"（該当: {', '.join(bad)}）"
         )
 
-def github_put_file_json(data: Dict[str, str], sha: str, commit_message: str) -> None:
+def _put_response_sha(r: requests.Response, content: bytes) -> str:
+    """PUT レスポンスの content.sha（取れなければ書いた本文から計算）"""
+    try:
+        sha = (r.json().get("content") or {}).get("sha", "")
+    except ValueError:
+        sha = ""
+    return sha or _git_blob_sha(content)
+
+
+def github_put_file_json(data: Dict[str, str], sha: str, commit_message: str) -> str:
     """
     GitHub Contents API へ JSON を保存（新規/更新）。
+    戻り: 保存後の新しい sha（読み直しの GET は不要）
     """
     token, owner, repo, path = _gh_conf()
 
@@ -145,19 +290,17 @@ def github_put_file_json(data: Dict[str, str], sha: str, commit_message: str) ->
         raise RuntimeError("GitHub Secrets が未設定です（GITHUB_TOKEN 等）")
 
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
 
-    body_text = json.dumps(data, ensure_ascii=False, indent=2)
-    content_b64 = base64.b64encode(body_text.encode("utf-8")).decode("utf-8")
+    # アプリだけが読み書きするファイルなので整形せずコンパクトに保存する
+    body_bytes = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    content_b64 = base64.b64encode(body_bytes).decode("ascii")
 
     payload = {"message": commit_message, "content": content_b64}
     if sha:
         payload["sha"] = sha
 
-    r = requests.put(url, headers=headers, json=payload, timeout=15)
+    r = _gh_session().put(url, headers=_gh_headers(token), json=payload, timeout=15)
+    _note_rate_limit(r)
 
     if r.status_code == 403:
         raise RuntimeError(
@@ -169,13 +312,144 @@ def github_put_file_json(data: Dict[str, str], sha: str, commit_message: str) ->
         )
 
     r.raise_for_status()
-    
+
+    # 新しい sha はレスポンスから返す
+    _gh_state()["failures"].pop(url, None)
+    return _put_response_sha(r, body_bytes)
+
+
+@st.cache_resource(show_spinner=False)
+def _templates_store() -> Dict:
+    """マイテンプレのプロセス共有コピー（TEMPLATES_TTL 秒以内の新規セッションは GitHub へ行かない）"""
+    return {"data": {}, "sha": "", "loaded": False, "checked_at": 0.0, "future": None}
+
+
+# 共有コピーをそのまま使う秒数（過ぎたら ETag 付きで確認し、変わっていなければ 304 で済む）
+TEMPLATES_TTL = 60.0
+
+
+@st.cache_resource(show_spinner=False)
+def _background_executor() -> ThreadPoolExecutor:
+    """初回ロードなど、画面の描画を待たせたくない I/O 用"""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def load_user_templates() -> None:
+    """
+    セッションへマイテンプレを載せる。
+    共有コピーが無いか TEMPLATES_TTL を過ぎていれば GitHub から裏で取り直し、終わるまでは空のまま画面を先に描く。
+    """
+    store = _templates_store()
+    if not store["loaded"] or time.monotonic() - store["checked_at"] >= TEMPLATES_TTL:
+        future = store["future"]
+        if future is None:
+            store["future"] = _background_executor().submit(_github_fetch_file_json, *_gh_conf())
+            return
+        if not future.done():
+            return
+        result = future.result()
+        store["future"] = None
+        if result is not None:
+            data, sha = result
+            store.update(data=data, sha=sha, loaded=True, checked_at=time.monotonic())
+        elif not store["loaded"]:
+            # 取得失敗はプロセス共有にせず、このセッションだけ空で続ける（次のセッションで取り直す）
+            st.session_state.user_templates = _apply_template_ops({}, st.session_state.pending_template_ops)
+            st.session_state.user_templates_sha = ""
+            st.session_state.user_templates_loaded = True
+            return
+        # 確認に失敗しただけなら手元の共有コピーで続ける
+
+    # セッション側はコピーを持つ（他セッションへ変更が漏れないように）
+    st.session_state.user_templates = _apply_template_ops(
+        dict(store["data"]), st.session_state.pending_template_ops
+    )
+    st.session_state.user_templates_sha = store["sha"]
+    st.session_state.user_templates_loaded = True
+    bump_user_templates_version()
+
+
+def set_user_templates(data: Dict[str, str], sha: str) -> None:
+    """保存/削除後の内容を共有ストアとセッションの両方へ反映"""
+    _templates_store().update(data=dict(data), sha=sha, loaded=True, checked_at=time.monotonic())
+    st.session_state.user_templates = dict(data)
+    st.session_state.user_templates_sha = sha
+    st.session_state.user_templates_loaded = True
+    bump_user_templates_version()
+
+
+def bump_user_templates_version() -> None:
+    """user_templates を変更したら呼ぶ（統合テンプレの作り直し合図）"""
+    st.session_state.user_templates_version = st.session_state.get("user_templates_version", 0) + 1
+
+
+@st.fragment(run_every=1.0)
+def _await_user_templates() -> None:
+    """裏で取得中のマイテンプレが揃ったら全体を再描画する"""
+    st.caption("マイテンプレを読み込み中…")
+    store = _templates_store()
+    future = store["future"]
+    # future が無い＝別セッションが結果を受け取って片付けた（全体再実行で共有コピーを使うか取り直す）
+    if future is None or future.done():
+        st.rerun()
+
+
+def queue_template_op(op: Tuple[str, ...]) -> None:
+    """
+    保存/削除を同期待ちに積み、画面上は即反映する（GitHub へはまとめて1回で書く）。
+    op: ("set", name, text) / ("del", name)
+    """
+    st.session_state.pending_template_ops.append(op)
+    if op[0] == "set":
+        st.session_state.user_templates[op[1]] = op[2]
+    else:
+        st.session_state.user_templates.pop(op[1], None)
+    bump_user_templates_version()
+
+
+def _apply_template_ops(data: Dict[str, str], ops: List[Tuple[str, ...]]) -> Dict[str, str]:
+    for op in ops:
+        if op[0] == "set":
+            data[op[1]] = op[2]
+        else:
+            data.pop(op[1], None)
+    return data
+
+
+def sync_template_ops() -> None:
+    """
+    同期待ちの操作を PUT 1回で GitHub へ反映。
+    セッションが持つ内容と sha をそのまま使い、sha 不一致（409/422）のときだけ取り直して1回やり直す。
+    """
+    ops = st.session_state.pending_template_ops
+    if not ops:
+        return
+
+    summary = ", ".join(f"{'save' if op[0] == 'set' else 'delete'} {op[1]}" for op in ops)
+    message = f"Update user templates: {summary}"
+
+    # セッション側は楽観的に ops 適用済み
+    data = dict(st.session_state.user_templates)
+    try:
+        new_sha = github_put_file_json(data=data, sha=st.session_state.user_templates_sha, commit_message=message)
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code not in (409, 422):
+            raise
+        # 他セッション等で更新されていた：最新を取り直して ops を当て直す
+        data, sha = github_get_file_json()
+        _apply_template_ops(data, ops)
+        new_sha = github_put_file_json(data=data, sha=sha, commit_message=message)
+    set_user_templates(data, new_sha)
+    st.session_state.pending_template_ops = []
+
 # =========================================================
 # Personas: GitHub 永続化（list形式）
 # 保存先: ThreadGenius/personas.json
 # =========================================================
 
+@st.cache_resource(show_spinner=False, max_entries=1)
 def _gh_personas_conf() -> Tuple[str, str, str, str]:
+    """ペルソナ保存先（_gh_conf と同じくプロセスで1回だけ読み、再読込は .clear()）"""
     token = (st.secrets.get("GITHUB_TOKEN", "") or "").strip()
     owner = (st.secrets.get("GITHUB_OWNER", "") or "").strip()
     repo  = (st.secrets.get("GITHUB_REPO", "") or "").strip()
@@ -189,21 +463,42 @@ def github_get_personas_json() -> Tuple[List[Dict[str, str]], str]:
         return [], ""
 
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"}
+    headers = _gh_headers(token)
 
-    r = requests.get(url, headers=headers, timeout=15)
-    if r.status_code == 404:
+    # 直近で失敗/未作成だったなら、しばらく叩き直さない（新規セッションごとの再試行を防ぐ）
+    if _gh_failure(url):
         return [], ""
-    r.raise_for_status()
 
-    payload = json.loads(r.content.decode("utf-8", errors="replace"))
+    # マイテンプレと同じく条件付きGET（未更新なら 304 で本文なし・レート消費なし）
+    etags = _gh_state()["etags"]
+    known = etags.get(url)
+    if known:
+        headers = {**headers, "If-None-Match": known[0]}
+
+    try:
+        r = _gh_session().get(url, headers=headers, timeout=15)
+        _note_rate_limit(r)
+        if r.status_code == 304 and known:
+            return [dict(p) for p in known[1]], known[2]
+        if r.status_code == 404:
+            etags.pop(url, None)
+            _note_gh_failure(url, GH_NOT_FOUND)
+            return [], ""
+        r.raise_for_status()
+    except requests.RequestException as e:
+        # 取得できなくても起動は落とさない（デフォルトのペルソナで続行）
+        _note_gh_failure(url, _describe_request_error(e))
+        return [], ""
+
+    # bytes のまま orjson で読む（str へのデコードを挟まない）
+    payload = orjson.loads(r.content)
     sha = payload.get("sha", "") or ""
-    content_b64 = (payload.get("content", "") or "").replace("\n", "").replace("\r", "")
-    decoded = base64.b64decode(content_b64).decode("utf-8", errors="replace")
+    # Contents API の base64 は60桁ごとに改行入り。validate=False なら改行はそのまま読み飛ばされる
+    content_b64 = (payload.get("content", "") or "").encode("ascii")
 
     try:
-        data = json.loads(decoded)
-    except Exception:
+        data = orjson.loads(base64.b64decode(content_b64, validate=False))
+    except ValueError:  # binascii.Error / orjson.JSONDecodeError はどちらも ValueError
         return [], sha
 
     if not isinstance(data, list):
@@ -222,10 +517,13 @@ def github_get_personas_json() -> Tuple[List[Dict[str, str]], str]:
             "goal": str(p.get("goal", "")).strip(),
         })
     cleaned = [p for p in cleaned if p["name"]]
+    etag = r.headers.get("ETag", "")
+    if etag:
+        etags[url] = (etag, [dict(p) for p in cleaned], sha)
     return cleaned, sha
 
 
-def github_put_personas_json(personas: List[Dict[str, str]], sha: str, commit_message: str) -> None:
+def github_put_personas_json(personas: List[Dict[str, str]], sha: str, commit_message: str) -> str:
     token, owner, repo, path = _gh_personas_conf()
     if not (token and owner and repo and path):
         raise RuntimeError("GitHub Secrets が未設定です（GITHUB_TOKEN/OWNER/REPO 等）")
@@ -234,18 +532,19 @@ def github_put_personas_json(personas: List[Dict[str, str]], sha: str, commit_me
     _assert_github_secrets_ascii(token, owner, repo, path)
 
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"}
-
-    content_bytes = json.dumps(personas, ensure_ascii=False, indent=2).encode("utf-8")
+    content_bytes = orjson.dumps(personas, option=orjson.OPT_INDENT_2)
     content_b64 = base64.b64encode(content_bytes).decode("ascii")
 
     body = {"message": commit_message, "content": content_b64}
     if sha:
         body["sha"] = sha
 
-    r = requests.put(url, headers=headers, json=body, timeout=20)
+    r = _gh_session().put(url, headers=_gh_headers(token), json=body, timeout=20)
+    _note_rate_limit(r)
     if r.status_code >= 400:
         raise RuntimeError(f"GitHub保存に失敗: {r.status_code} {r.text}")
+    _gh_state()["failures"].pop(url, None)
+    return _put_response_sha(r, content_bytes)
 
 
 def persona_to_dict(p: "PersonaConfig") -> Dict[str, str]:
@@ -276,16 +575,50 @@ def persist_personas_to_github(commit_message: str) -> None:
     # session_state.personas（PersonaConfigのlist）を GitHub へ保存して sha を更新する
     payload = [persona_to_dict(p) for p in st.session_state.personas]
 
-    github_put_personas_json(
+    # 次回の保存に使う sha は PUT のレスポンスから取る（読み直しの GET はしない）
+    st.session_state.personas_sha = github_put_personas_json(
         payload,
         st.session_state.get("personas_sha", ""),
         commit_message=commit_message
     )
 
-    # sha更新のため読み直し（ここが重要）
-    personas_data, sha = github_get_personas_json()
-    st.session_state.personas = [dict_to_persona(d) for d in personas_data]
-    st.session_state.personas_sha = sha
+
+def bump_personas_version() -> None:
+    """personas を変更したら呼ぶ（派生データの作り直し合図）"""
+    st.session_state.personas_version = st.session_state.get("personas_version", 0) + 1
+
+
+def _persona_lookup() -> Tuple[Tuple[str, ...], Dict[str, PersonaConfig], Dict[str, int], Dict[str, str]]:
+    """
+    ペルソナ名の一覧 / name → PersonaConfig / name → index /
+    テンプレのカテゴリ → 名前にそのカテゴリを含む最初のペルソナ（なければ先頭）。
+    personas_version が変わったときだけ作り直す。
+    """
+    version = st.session_state.personas_version
+    cached = st.session_state.get("persona_lookup_cache")
+    if cached is None or cached[0] != version:
+        by_name: Dict[str, PersonaConfig] = {}
+        name_to_idx: Dict[str, int] = {}
+        for i, p in enumerate(st.session_state.personas):
+            # 同名があれば従来どおり先頭を優先
+            by_name.setdefault(p.name, p)
+            name_to_idx.setdefault(p.name, i)
+        names = tuple(p.name for p in st.session_state.personas)
+        by_category = {
+            cat: next((n for n in names if cat in n), names[0] if names else "")
+            for cat in set(PRESET_TO_CATEGORY.values())
+        }
+        cached = (version, names, by_name, name_to_idx, by_category)
+        st.session_state.persona_lookup_cache = cached
+    return cached[1], cached[2], cached[3], cached[4]
+
+
+def get_persona_names() -> Tuple[str, ...]:
+    return _persona_lookup()[0]
+
+
+def get_persona_index(persona_name: str) -> Optional[int]:
+    return _persona_lookup()[2].get(persona_name)
 
 # -------------------------
 # Session State Init
@@ -305,12 +638,21 @@ def _init_state():
             st.session_state.personas = DEFAULT_PERSONAS.copy()
             st.session_state.personas_sha = ""
 
+        bump_personas_version()
+
     if "rss_feeds" not in st.session_state:
         st.session_state.rss_feeds = DEFAULT_RSS_FEEDS.copy()
 
+    # 重複チェック用（rss_feeds を変更したときだけ作り直す）
+    if "rss_feeds_set" not in st.session_state:
+        st.session_state.rss_feeds_set = set(st.session_state.rss_feeds)
+
     if "generated_posts" not in st.session_state:
         st.session_state.generated_posts = []
 
+    if "generated_columns" not in st.session_state:
+        st.session_state.generated_columns = {}
+
     if "selected_persona_name" not in st.session_state:
         st.session_state.selected_persona_name = (
             st.session_state.personas[0].name if st.session_state.personas else ""
@@ -319,6 +661,25 @@ def _init_state():
     if "news_manual_text" not in st.session_state:
         st.session_state.news_manual_text = ""
 
+    # ページを離れると widget のキーは消えるので、値はこちらに退避しておく（_seed_widget）
+    if "num_posts_value" not in st.session_state:
+        st.session_state.num_posts_value = 5
+
+    if "news_source_type_value" not in st.session_state:
+        st.session_state.news_source_type_value = "RSSフィードから自動取得"
+
+    if "news_content_rss_text" not in st.session_state:
+        st.session_state.news_content_rss_text = ""
+
+    if "tpl_name" not in st.session_state:
+        st.session_state.tpl_name = ""
+
+    if "tpl_text" not in st.session_state:
+        st.session_state.tpl_text = ""
+
+    if "post_drafts" not in st.session_state:
+        st.session_state.post_drafts = {}
+
     if "preset_key" not in st.session_state:
         st.session_state.preset_key = "（選択なし）"
 
@@ -329,16 +690,20 @@ def _init_state():
         st.session_state.selected_topic_theme = "Web集客"
 
     if "generation_run_id" not in st.session_state:
-        st.session_state.generation_run_id = "0"
+        st.session_state.generation_run_id = 0
 
     if "threads_client" not in st.session_state:
         st.session_state.threads_client = None
 
-    # GitHub templates cache
+    # GitHub templates cache（取得完了までは空で描画）
     if "user_templates" not in st.session_state or "user_templates_sha" not in st.session_state:
-        data, sha = github_get_file_json()
-        st.session_state.user_templates = data
-        st.session_state.user_templates_sha = sha
+        st.session_state.user_templates = {}
+        st.session_state.user_templates_sha = ""
+        st.session_state.user_templates_loaded = False
+
+    if "pending_template_ops" not in st.session_state:
+        st.session_state.pending_template_ops = []
+    # マイテンプレ本体は「手動で入力」を初めて開いたときに読み込む（load_user_templates）
 
 
 _init_state()
@@ -347,20 +712,21 @@ _init_state()
 # -------------------------
 # Helpers
 # -------------------------
-TOPIC_THEME_TO_TAG = {
-    "Web集客": "#Web集客",
-    "マーケティング": "#マーケティング",
-    "店舗集客": "#店舗集客",
-}
+PAGE_LABELS = ("📝 投稿生成", "🎭 ペルソナ管理", "🔗 Threads連携", "📊 分析")
 
+def _seed_widget(key: str, saved_key: str) -> None:
+    """ページ切替で消えた widget の値を、退避しておいた値から戻す（描画前に呼ぶ）"""
+    if key not in st.session_state:
+        st.session_state[key] = st.session_state[saved_key]
 
-def safe_get_persona_by_name(personas: List[PersonaConfig], persona_name: str) -> Optional[PersonaConfig]:
-    if not personas:
-        return None
-    for p in personas:
-        if p.name == persona_name:
-            return p
-    return personas[0]
+
+# マイテンプレをテンプレ選択肢に並べるときの接頭辞
+MY_TEMPLATE_PREFIX = "🧷マイテンプレ｜"
+
+
+def safe_get_persona_by_name(persona_name: str) -> Optional[PersonaConfig]:
+    by_name = _persona_lookup()[1]
+    return by_name.get(persona_name) or next(iter(by_name.values()), None)
 
 
 def extract_hook_body_cta(post: Dict) -> Tuple[str, str, str]:
@@ -370,10 +736,125 @@ def extract_hook_body_cta(post: Dict) -> Tuple[str, str, str]:
     return hook, body, cta
 
 
+def get_combined_templates() -> Tuple[ChainMap, List[str], Dict[str, int]]:
+    """
+    既存テンプレ + マイテンプレ（ChainMap で重ねる）と選択肢・index。
+    user_templates_version が変わったときだけ作り直す。
+    """
+    version = st.session_state.get("user_templates_version", 0)
+    cached = st.session_state.get("combined_templates_cache")
+    if cached is None or cached[0] != version:
+        user_presets_renamed = {MY_TEMPLATE_PREFIX + k: v for k, v in st.session_state.user_templates.items()}
+        # 選択肢は既存 → マイテンプレの順
+        preset_keys = list(PRESET_NEWS_TEMPLATES) + list(user_presets_renamed)
+        preset_key_to_idx = {k: i for i, k in enumerate(preset_keys)}
+        combined = ChainMap(user_presets_renamed, PRESET_NEWS_TEMPLATES)
+        cached = (version, combined, preset_keys, preset_key_to_idx)
+        st.session_state.combined_templates_cache = cached
+    return cached[1], cached[2], cached[3]
+
+
+def build_post_columns(posts: List[Dict]) -> Dict[str, object]:
+    """
+    生成結果を列ごとの配列（struct-of-arrays）にまとめる。
+    生成直後に1回だけ作り、再描画ではインデックスで読むだけにする。
+    """
+    n = len(posts)
+    scores = np.fromiter((float(p.get("score", 0) or 0) for p in posts), dtype=np.float32, count=n)
+    lengths = np.fromiter((len(p.get("post_text", "") or "") for p in posts), dtype=np.int32, count=n)
+    # スコア帯の色バッジ（80以上🟢 / 60以上🟡 / それ未満🔴）
+    badges = np.select([scores >= 80, scores >= 60], ["🟢", "🟡"], default="🔴")
+
+    meta_lines = []
+    for p in posts:
+        hook, body, cta = extract_hook_body_cta(p)
+        meta_lines.append((
+            f"**hook**: {hook}",
+            f"**body**: {body}",
+            f"**cta**: {cta}",
+            f"**predicted_stage**: {p.get('predicted_stage','')}",
+            f"**conversation_trigger**: {p.get('conversation_trigger','')}",
+            f"**reasoning**: {p.get('reasoning','')}",
+            f"**lens**: {p.get('lens', 'N/A')}",
+        ))
+
+    return {
+        "score": scores,
+        "length": lengths,
+        "badge": badges,
+        "post_text": [p.get("post_text", "") for p in posts],
+        "topic_tag": [p.get("topic_tag", "") for p in posts],
+        "style_mode": [p.get("style_mode", "") for p in posts],
+        "meta_lines": meta_lines,
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=4, on_release=lambda poller: poller.stop())
+def start_news_poller(feeds: Tuple[str, ...]) -> NewsPoller:
+    """
+    フィード集合ごとにバックグラウンド取得を1つだけ起動（全セッション共有）。
+    「最新ニュース取得」はこのメモリ上の結果を読むだけにする。
+    古いフィード集合の取得はキャッシュから外れた時点で止める（最大4つ）。
+    """
+    from news_collector import NewsPoller
+
+    return NewsPoller(list(feeds)).start()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_news_collector(feeds: Tuple[str, ...]) -> NewsCollector:
+    """フィード集合ごとに NewsCollector を1つだけ作って使い回す（全セッション共有・最大8つ）"""
+    from news_collector import NewsCollector
+
+    return NewsCollector(list(feeds))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_collect_news(feeds: Tuple[str, ...], limit: int) -> List[Dict]:
+    """空の結果はキャッシュしない（例外は cache_data に残らないので、次の押下で取り直す）"""
+    news_items = get_news_collector(feeds).collect_news(limit=limit)
+    if not news_items:
+        raise LookupError("no news items")
+    return news_items
+
+
+@st.fragment
+def render_rss_feeds():
+    """
+    RSSフィードの追加・編集（操作してもこの部分だけ再実行する）。
+    一覧は追加処理の後に描くので、追加・編集後の st.rerun() は不要。
+    """
+    new_feed = st.text_input("新しいRSSフィードを追加")
+    if st.button("追加", use_container_width=True) and new_feed:
+        if new_feed not in st.session_state.rss_feeds_set:
+            st.session_state.rss_feeds.append(new_feed)
+            st.session_state.rss_feeds_set.add(new_feed)
+            st.success("追加しました")
+
+    if st.session_state.rss_feeds:
+        st.caption("登録済み（行の追加・削除・編集ができます）:")
+        edited = st.data_editor(
+            pd.DataFrame({"feed": st.session_state.rss_feeds}),
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+        )
+        edited_feeds = list(dict.fromkeys(
+            str(f).strip() for f in edited["feed"].dropna() if str(f).strip()
+        ))
+        if edited_feeds != st.session_state.rss_feeds:
+            st.session_state.rss_feeds = edited_feeds
+            st.session_state.rss_feeds_set = set(edited_feeds)
+
+
 # -------------------------
 # Sidebar (Settings)
 # -------------------------
 with st.sidebar:
+    page = st.radio("ページ", PAGE_LABELS, key="page_select")
+
+    st.divider()
+
     st.header("⚙️ 設定")
 
     st.subheader("🔑 APIキー")
@@ -404,47 +885,165 @@ with st.sidebar:
     else:
         st.warning("Secrets に GITHUB_TOKEN / GITHUB_OWNER / GITHUB_REPO / GITHUB_TEMPLATES_PATH を設定してください。")
 
+    now = time.monotonic()
+    failures = [
+        reason for until, reason in _gh_state()["failures"].values()
+        if until > now and reason != GH_NOT_FOUND
+    ]
+    if failures:
+        st.warning(f"GitHub からの取得に失敗しました（{failures[-1]}）。しばらくしてから再試行します。")
+
+    rate_remaining = _gh_state()["rate_remaining"]
+    if rate_remaining is not None and rate_remaining < 100:
+        st.warning(f"GitHub API の残りリクエスト数が少なくなっています（残り {rate_remaining}）。")
+
     st.divider()
 
     st.subheader("📰 RSSフィード")
-    new_feed = st.text_input("新しいRSSフィードを追加")
-    if st.button("追加", use_container_width=True) and new_feed:
-        if new_feed not in st.session_state.rss_feeds:
-            st.session_state.rss_feeds.append(new_feed)
-            st.success("追加しました")
-            st.rerun()
+    render_rss_feeds()
 
-    if st.session_state.rss_feeds:
-        st.caption("登録済み:")
-        for i, feed in enumerate(st.session_state.rss_feeds):
-            c1, c2 = st.columns([4, 1])
-            with c1:
-                st.write(feed)
-            with c2:
-                if st.button("🗑", key=f"del_feed_{i}"):
-                    st.session_state.rss_feeds.pop(i)
-                    st.rerun()
+# RSSはバックグラウンドで先読みしておく（ボタン押下時はメモリから読むだけ）
+start_news_poller(tuple(st.session_state.rss_feeds))
 
-# -------------------------
-# Tabs
-# -------------------------
-tab1, tab2, tab3, tab4 = st.tabs(["📝 投稿生成", "🎭 ペルソナ管理", "🔗 Threads連携", "📊 分析"])
 # =========================================================
 # Tab1: 投稿生成
 # =========================================================
-with tab1:
+@st.fragment
+def render_preset_picker():
+    """テンプレ選択・プレビュー・反映ボタン（本文欄は外側に置く）"""
+    # ---- 統合テンプレ（既存 + GitHubマイテンプレ）：コピーせず ChainMap で重ねる
+    user_templates = st.session_state.get("user_templates", {}) or {}
+    combined_templates, preset_keys, preset_key_to_idx = get_combined_templates()
+
+    # === テンプレ手動入力ブロック（ここを1箇所にまとめる） ===
+
+    # 1) テンプレ選択（indexを使わず安定）
+    if "preset_key_select" not in st.session_state:
+        st.session_state.preset_key_select = st.session_state.get("preset_key", "（選択なし）")
+    if st.session_state.preset_key_select not in preset_key_to_idx:
+        st.session_state.preset_key_select = "（選択なし）"
+
+    preset_key = st.selectbox(
+        "テンプレを選択（選択後に「反映」ボタンで本文へ反映）",
+        preset_keys,
+        key="preset_key_select",
+    )
+    st.session_state.preset_key = preset_key
+
+    # 2) テンプレ本文取得（selectboxの後）
+    def _get_template_text(selected_key: str) -> str:
+        if selected_key == "（選択なし）":
+            return ""
+        if selected_key in PRESET_NEWS_TEMPLATES:
+            return PRESET_NEWS_TEMPLATES.get(selected_key, "")
+        if selected_key.startswith(MY_TEMPLATE_PREFIX):
+            raw_name = selected_key[len(MY_TEMPLATE_PREFIX):]
+            return (user_templates.get(raw_name) or "")
+        return combined_templates.get(selected_key, "")
+
+    tpl_preview = _get_template_text(preset_key)
+
+    # 3) プレビュー表示（確実に出る）
+    st.markdown("**テンプレ本文プレビュー（編集は下の本文欄で）**")
+    st.code(tpl_preview if tpl_preview else "（プレビューなし：テンプレを選択してください）")
+
+    # 4) 反映ボタン（本文欄キーも更新）
+    if st.button("⬇️ このテンプレを本文に反映", use_container_width=True, key="apply_template_btn"):
+        st.session_state.news_manual_text = tpl_preview
+        st.session_state.news_manual_text_area = tpl_preview
+
+        # 既存テンプレだけカテゴリで自動切替（マイテンプレは対象外）
+        if preset_key in PRESET_TO_CATEGORY:
+            cat = PRESET_TO_CATEGORY.get(preset_key, "")
+            if cat:
+                target_persona = _persona_lookup()[3].get(cat, "")
+                if target_persona:
+                    st.session_state.selected_persona_name = target_persona
+
+        st.rerun()
+
+
+@st.fragment
+def render_template_manager():
+    """マイテンプレの保存/削除/同期（入力中はこの部分だけ再実行）"""
+    with st.expander("🧷 マイテンプレ管理（保存/削除 → GitHubへ同期）", expanded=False):
+        token, owner, repo, path = _gh_conf()
+        if not (token and owner and repo and path):
+            st.warning("Secrets に GitHub設定が必要です（GITHUB_TOKEN 等）")
+        else:
+            st.caption(f"保存先: {owner}/{repo} → {path}")
+
+        _seed_widget("tpl_name_input", "tpl_name")
+        _seed_widget("tpl_text_input", "tpl_text")
+        tpl_name = st.text_input("テンプレ名（重複OK：上書き）", key="tpl_name_input")
+        tpl_text = st.text_area("テンプレ本文（保存する内容）", height=160, key="tpl_text_input")
+        st.session_state.tpl_name = tpl_name
+        st.session_state.tpl_text = tpl_text
+
+        s1, s2 = st.columns([1, 1])
+        with s1:
+            if st.button("💾 保存", use_container_width=True, key="save_tpl_btn"):
+                name = (tpl_name or "").strip()
+                text = (tpl_text or "").strip()
+                if not name:
+                    st.warning("テンプレ名を入力してください。")
+                elif not text:
+                    st.warning("テンプレ本文を入力してください。")
+                else:
+                    queue_template_op(("set", name, text))
+                    st.rerun()
+
+        with s2:
+            saved_names = list((st.session_state.get("user_templates", {}) or {}).keys())
+            delete_target = st.selectbox(
+                "削除するテンプレ",
+                options=["（選択なし）"] + saved_names,
+                key="delete_tpl_select",
+            )
+            if st.button("🗑 削除", use_container_width=True, key="delete_tpl_btn"):
+                if delete_target == "（選択なし）":
+                    st.warning("削除対象を選択してください。")
+                else:
+                    queue_template_op(("del", delete_target))
+                    st.rerun()
+
+        # ---- 同期待ちの保存/削除をまとめて GitHub へ
+        pending = st.session_state.pending_template_ops
+        if pending:
+            st.info(f"GitHub へ未同期の変更が {len(pending)} 件あります。")
+        if st.button(
+            "🔄 GitHubへ同期",
+            use_container_width=True,
+            key="sync_tpl_btn",
+            disabled=not pending,
+        ):
+            try:
+                sync_template_ops()
+                st.success("GitHub へ同期しました。")
+                st.rerun()
+            except Exception as e:
+                st.error(f"同期に失敗しました: {e}")
+
+        if st.session_state.get("user_templates"):
+            st.markdown("**保存済みマイテンプレ**")
+            st.write(list(st.session_state.user_templates.keys()))
+        else:
+            st.caption("まだマイテンプレはありません。")
+
+
+@st.fragment
+def render_post_tab():
     st.subheader("📝 投稿生成")
 
     # ---- Persona select
-    persona_names = [p.name for p in st.session_state.personas]
+    persona_names = get_persona_names()
     if not persona_names:
-        st.error("ペルソナがありません。『ペルソナ管理』タブで作成してください。")
+        st.error("ペルソナがありません。サイドバーで『ペルソナ管理』ページを開いて作成してください。")
         st.stop()
 
     # 現在選択のindex
-    try:
-        persona_index = persona_names.index(st.session_state.selected_persona_name)
-    except ValueError:
+    persona_index = get_persona_index(st.session_state.selected_persona_name)
+    if persona_index is None:
         persona_index = 0
         st.session_state.selected_persona_name = persona_names[0]
 
@@ -458,7 +1057,7 @@ with tab1:
         )
         st.session_state.selected_persona_name = selected_persona_name
 
-        selected_persona = safe_get_persona_by_name(st.session_state.personas, selected_persona_name)
+        selected_persona = safe_get_persona_by_name(selected_persona_name)
         if selected_persona is None:
             st.error("ペルソナの取得に失敗しました。")
             st.stop()
@@ -471,15 +1070,16 @@ with tab1:
             st.write(f"**目標**: {selected_persona.goals}")
 
     with c2:
+        _seed_widget("num_posts", "num_posts_value")
         num_posts = st.number_input(
             "生成する投稿数",
             min_value=1,
             max_value=10,
-            value=5,
             step=1,
             help="一度に生成する案の数",
             key="num_posts",
         )
+        st.session_state.num_posts_value = num_posts
 
     st.divider()
 
@@ -494,9 +1094,8 @@ with tab1:
     st.markdown("### 🏷️ テーマ（topic_tag を全投稿に強制適用）")
     selected_topic_theme = st.selectbox(
         "今回のテーマ",
-        list(TOPIC_THEME_TO_TAG.keys()),
-        index=list(TOPIC_THEME_TO_TAG.keys()).index(st.session_state.selected_topic_theme)
-        if st.session_state.selected_topic_theme in TOPIC_THEME_TO_TAG else 0,
+        TOPIC_THEME_KEYS,
+        index=TOPIC_THEME_TO_IDX.get(st.session_state.selected_topic_theme, 0),
         key="topic_theme_select",
     )
     st.session_state.selected_topic_theme = selected_topic_theme
@@ -507,12 +1106,14 @@ with tab1:
 
     # ---- ニュース入力方法
     st.markdown("### 📰 ニュース/素材の入力")
+    _seed_widget("news_source_type", "news_source_type_value")
     news_source_type = st.radio(
         "入力方法",
         ["RSSフィードから自動取得", "手動で入力（テンプレあり）"],
         horizontal=True,
         key="news_source_type",
     )
+    st.session_state.news_source_type_value = news_source_type
 
     news_content = ""
 
@@ -525,11 +1126,29 @@ with tab1:
             fetch = st.button("🔄 最新ニュース取得", use_container_width=True)
         with col_r2:
             st.caption("RSSからニュースを取得し、AIに渡す形式へ整形します。")
+            force_refresh = st.checkbox(
+                "強制再取得",
+                key="force_news_refresh",
+                help="キャッシュを使わず、いまフィードを読み直します。",
+            )
 
         if fetch:
-            with st.spinner("ニュース取得中..."):
-                collector = NewsCollector(st.session_state.rss_feeds)
-                news_items = collector.collect_news(limit=8)
+            # フィード一覧はサイドバーの fragment 内で変わるので、押下時点の一覧でポーラーを引く
+            news_poller = start_news_poller(tuple(st.session_state.rss_feeds))
+            if force_refresh:
+                _cached_collect_news.clear()
+                get_news_collector(tuple(st.session_state.rss_feeds)).invalidate()
+                with st.spinner("ニュース取得中..."):
+                    # 応答しないフィードがあっても画面を止めない（終わった分だけ使う）
+                    news_poller.refresh(timeout=15)
+            news_items = news_poller.snapshot(limit=8)
+            if not news_items:
+                # 初回ポーリングが未完了のときだけ直接取得（5分キャッシュ）
+                with st.spinner("ニュース取得中..."):
+                    try:
+                        news_items = _cached_collect_news(tuple(st.session_state.rss_feeds), 8)
+                    except LookupError:
+                        news_items = []
 
             if not news_items:
                 st.warning("ニュースが取得できませんでした。RSS URL を見直してください。")
@@ -547,96 +1166,32 @@ with tab1:
                     st.write(f"**概要**: {selected_news.get('summary','')}")
                     st.write(f"**リンク**: {selected_news.get('link','')}")
                     st.write(f"**公開日**: {selected_news.get('published','')}")
-                news_content = collector.format_for_ai(selected_news)
+                # 取得したニュースで本文欄を置き換える（描画前なので widget キーへ直接入れる）
+                st.session_state.news_content_rss = (
+                    get_news_collector(tuple(st.session_state.rss_feeds)).format_for_ai(selected_news)
+                )
 
         # 取得済みを編集できるように（任意）
+        _seed_widget("news_content_rss", "news_content_rss_text")
         news_content = st.text_area(
             "AIに渡すニュース内容（編集可）",
-            value=news_content,
             height=180,
             key="news_content_rss",
         )
+        st.session_state.news_content_rss_text = news_content
 
     # =========================================================
     # 手動入力 + テンプレ（既存テンプレ + GitHubマイテンプレ）
     # =========================================================
     else:
-        # ---- 既存テンプレ（最低限のサンプル：必要なら後で増やせます）
-        PRESET_NEWS_TEMPLATES = {
-            "（選択なし）": "",
-            "✅ 完成版｜起業家（申込）発信量より順番": "SNSで頑張ってるのに、申込が増えない人へ。\n原因は「発信量」より、申込までの“順番”が詰まってることが多いです。\n\nあなたのボトルネックはどれ？（番号でOK）\n1 導線\n2 LP\n3 オファー\n4 信頼\n5 計測",
-            "✅ 完成版｜店舗（新規）見つけてもらえない": "新規が増えない店舗へ。\n原因は「投稿が少ない」より、見つけてもらう入口が弱いことが多いです。\n\nどこが弱い？（番号でOK）\n1 Googleマップ\n2 検索\n3 SNS\n4 写真\n5 初回不安の解消",
-        }
-
-        # 既存テンプレからカテゴリ→ペルソナ自動切替（簡易）
-        PRESET_TO_CATEGORY = {
-            "✅ 完成版｜起業家（申込）発信量より順番": "ビジネス",
-            "✅ 完成版｜店舗（新規）見つけてもらえない": "店舗",
-        }
+        # マイテンプレはここで初めて読み込む（裏で取得し、揃ったら再描画）
+        if not st.session_state.user_templates_loaded:
+            load_user_templates()
+            if not st.session_state.user_templates_loaded:
+                _await_user_templates()
 
-        def _find_persona_by_keyword(names: List[str], keyword: str) -> str:
-            for n in names:
-                if keyword in n:
-                    return n
-            return names[0] if names else ""
-
-        # ---- 統合テンプレ（既存 + GitHubマイテンプレ）
-        user_templates = st.session_state.get("user_templates", {}) or {}
-        combined_templates: Dict[str, str] = {}
-        combined_templates.update(PRESET_NEWS_TEMPLATES)
-
-        for k, v in user_templates.items():
-            combined_templates[f"🧷マイテンプレ｜{k}"] = v
-
-        preset_keys = list(combined_templates.keys())
-
-        # === テンプレ手動入力ブロック（ここを1箇所にまとめる） ===
-
-        # 1) テンプレ選択（indexを使わず安定）
-        if "preset_key_select" not in st.session_state:
-            st.session_state.preset_key_select = st.session_state.get("preset_key", "（選択なし）")
-        if st.session_state.preset_key_select not in preset_keys:
-            st.session_state.preset_key_select = "（選択なし）"
-
-        preset_key = st.selectbox(
-            "テンプレを選択（選択後に「反映」ボタンで本文へ反映）",
-            preset_keys,
-            key="preset_key_select",
-        )
-        st.session_state.preset_key = preset_key
-
-        # 2) テンプレ本文取得（selectboxの後）
-        def _get_template_text(selected_key: str) -> str:
-            if selected_key == "（選択なし）":
-                return ""
-            if selected_key in PRESET_NEWS_TEMPLATES:
-                return PRESET_NEWS_TEMPLATES.get(selected_key, "")
-            prefix = "🧷マイテンプレ｜"
-            if selected_key.startswith(prefix):
-                raw_name = selected_key[len(prefix):]
-                return (user_templates.get(raw_name) or "")
-            return combined_templates.get(selected_key, "")
-
-        tpl_preview = _get_template_text(preset_key)
-
-        # 3) プレビュー表示（確実に出る）
-        st.markdown("**テンプレ本文プレビュー（編集は下の本文欄で）**")
-        st.code(tpl_preview if tpl_preview else "（プレビューなし：テンプレを選択してください）")
-
-        # 4) 反映ボタン（本文欄キーも更新）
-        if st.button("⬇️ このテンプレを本文に反映", use_container_width=True, key="apply_template_btn"):
-            st.session_state.news_manual_text = tpl_preview
-            st.session_state.news_manual_text_area = tpl_preview
-
-            # 既存テンプレだけカテゴリで自動切替（マイテンプレは対象外）
-            if preset_key in PRESET_TO_CATEGORY:
-                cat = PRESET_TO_CATEGORY.get(preset_key, "")
-                if cat:
-                    target_persona = _find_persona_by_keyword(persona_names, cat)
-                    if target_persona:
-                        st.session_state.selected_persona_name = target_persona
-
-            st.rerun()
+        # テンプレ選択〜反映（選択を変えてもこの部分だけ再実行）
+        render_preset_picker()
 
         # 5) 本文欄（ここは1回だけ）
         st.text_area(
@@ -652,65 +1207,7 @@ with tab1:
 
 
         # ---- GitHubマイテンプレ管理
-        with st.expander("🧷 マイテンプレ管理（GitHubへ保存/削除）", expanded=False):
-            token, owner, repo, path = _gh_conf()
-            if not (token and owner and repo and path):
-                st.warning("Secrets に GitHub設定が必要です（GITHUB_TOKEN 等）")
-            else:
-                st.caption(f"保存先: {owner}/{repo} → {path}")
-
-            tpl_name = st.text_input("テンプレ名（重複OK：上書き）", key="tpl_name_input")
-            tpl_text = st.text_area("テンプレ本文（保存する内容）", height=160, key="tpl_text_input")
-
-            s1, s2 = st.columns([1, 1])
-            with s1:
-                if st.button("💾 保存（GitHubへ）", use_container_width=True, key="save_tpl_btn"):
-                    name = (tpl_name or "").strip()
-                    text = (tpl_text or "").strip()
-                    if not name:
-                        st.warning("テンプレ名を入力してください。")
-                    elif not text:
-                        st.warning("テンプレ本文を入力してください。")
-                    else:
-                        try:
-                            data, sha = github_get_file_json()
-                            data[name] = text
-                            github_put_file_json(data=data, sha=sha, commit_message=f"Save user template: {name}")
-                            st.session_state.user_templates = data
-                            st.session_state.user_templates_sha = sha
-                            st.success(f"保存しました: {name}")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"保存に失敗しました: {e}")
-
-            with s2:
-                saved_names = list((st.session_state.get("user_templates", {}) or {}).keys())
-                delete_target = st.selectbox(
-                    "削除するテンプレ",
-                    options=["（選択なし）"] + saved_names,
-                    key="delete_tpl_select",
-                )
-                if st.button("🗑 削除（GitHubへ）", use_container_width=True, key="delete_tpl_btn"):
-                    if delete_target == "（選択なし）":
-                        st.warning("削除対象を選択してください。")
-                    else:
-                        try:
-                            data, sha = github_get_file_json()
-                            if delete_target in data:
-                                data.pop(delete_target, None)
-                            github_put_file_json(data=data, sha=sha, commit_message=f"Delete user template: {delete_target}")
-                            st.session_state.user_templates = data
-                            st.session_state.user_templates_sha = sha
-                            st.success(f"削除しました: {delete_target}")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"削除に失敗しました: {e}")
-
-            if st.session_state.get("user_templates"):
-                st.markdown("**保存済みマイテンプレ**")
-                st.write(list(st.session_state.user_templates.keys()))
-            else:
-                st.caption("まだマイテンプレはありません。")
+        render_template_manager()
 
     st.divider()
 
@@ -727,6 +1224,8 @@ with tab1:
 
     if st.button("✨ 投稿を生成する", type="primary", disabled=not can_generate, use_container_width=True):
         with st.spinner("生成中..."):
+            from ai_generator import ThreadsPostGenerator
+
             gen = ThreadsPostGenerator(api_key=anthropic_key)
             gen.ui_mode_calm_priority = bool(st.session_state.generation_mode_calm)
             gen.forced_topic_tag = forced_topic_tag
@@ -738,12 +1237,14 @@ with tab1:
             )
 
             # 再生成で表示キーを変える（Streamlitの更新不具合回避）
-            st.session_state.generation_run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+            st.session_state.generation_run_id += 1
             st.write("DEBUG len(posts):", len(posts))
             st.write("DEBUG type(posts[0]):", type(posts[0]) if posts else "EMPTY")
             st.write("DEBUG posts[0] keys:", list(posts[0].keys()) if posts and isinstance(posts[0], dict) else posts[0])
             st.write("DEBUG post_text head:", repr(posts[0].get("post_text"))[:200] if posts else "EMPTY")
             st.session_state.generated_posts = posts
+            st.session_state.generated_columns = build_post_columns(posts)
+            st.session_state.post_drafts = {}
             st.write("DEBUG UI num_posts:", int(num_posts))
             st.write("DEBUG len(posts from generator):", len(posts))
             st.write("DEBUG type(posts):", type(posts))
@@ -759,53 +1260,42 @@ with tab1:
     # =========================================================
     st.markdown("### 📌 生成結果")
 
-    posts = st.session_state.get("generated_posts", []) or []
-    if not posts:
+    cols = st.session_state.generated_columns
+    n_posts = len(cols.get("score", ()))
+    if not n_posts:
         st.caption("まだ生成結果はありません。")
     else:
-        for i, post in enumerate(posts):
-            score = post.get("score", 0)
-            topic_tag = post.get("topic_tag", "")
-            style_mode = post.get("style_mode", "")
-            lens = post.get("lens", "N/A")
-
-            hook, body, cta = extract_hook_body_cta(post)
-
+        for i in range(n_posts):
             with st.container(border=True):
                 h1, h2, h3 = st.columns([2, 1, 1])
                 with h1:
-                    st.markdown(f"**#{i+1}**  スコア: **{score}**")
+                    st.markdown(f"{cols['badge'][i]} **#{i+1}**  スコア: **{cols['score'][i]:g}**  （{cols['length'][i]}字）")
                 with h2:
-                    st.caption(f"tag: {topic_tag}")
+                    st.caption(f"tag: {cols['topic_tag'][i]}")
                 with h3:
-                    st.caption(f"mode: {style_mode}")
+                    st.caption(f"mode: {cols['style_mode'][i]}")
 
                 # 表示キーをrun_idで変える
                 edit_key = f"post_text_{st.session_state.generation_run_id}_{i}"
 
-                # ★追加：post_textが空かどうか確定させる
-                st.write("DEBUG post_text repr:", repr(post.get("post_text", None))[:200])
-
+                # 編集中の本文はページを移っても残す（post_drafts に退避）
+                if edit_key not in st.session_state:
+                    st.session_state[edit_key] = st.session_state.post_drafts.get(edit_key, cols["post_text"][i])
                 post_text = st.text_area(
                   "投稿本文（編集可）",
-                   value=post.get("post_text", ""),
                    height=160,
                    key=edit_key,
                 )
+                st.session_state.post_drafts[edit_key] = post_text
 
                 with st.expander("🔎 メタ情報（hook/body/cta など）"):
-                    st.write(f"**hook**: {hook}")
-                    st.write(f"**body**: {body}")
-                    st.write(f"**cta**: {cta}")
-                    st.write(f"**predicted_stage**: {post.get('predicted_stage','')}")
-                    st.write(f"**conversation_trigger**: {post.get('conversation_trigger','')}")
-                    st.write(f"**reasoning**: {post.get('reasoning','')}")
-                    st.write(f"**lens**: {lens}")
-
-                # 送信ボタン（Threads連携は Tab3 でもできるが、ここからも送れるようにする）
-                if st.button("📤 この投稿をThreadsへ送る（Tab3の認証が必要）", key=f"send_post_{i}"):
+                    for line in cols["meta_lines"][i]:
+                        st.write(line)
+
+                # 送信ボタン（Threads連携ページでもできるが、ここからも送れるようにする）
+                if st.button("📤 この投稿をThreadsへ送る（Threads連携ページの認証が必要）", key=f"send_post_{i}"):
                     if not st.session_state.get("threads_client"):
-                        st.warning("Threads連携が未完了です。先に『Threads連携』タブで認証してください。")
+                        st.warning("Threads連携が未完了です。先にサイドバーから『Threads連携』ページを開いて認証してください。")
                     else:
                         try:
                             res = st.session_state.threads_client.create_post(post_text)
@@ -819,7 +1309,8 @@ with tab1:
 # =========================================================
 # Tab2: ペルソナ管理（CRUD）※GitHub自動保存版
 # =========================================================
-with tab2:
+@st.fragment
+def render_persona_tab():
     st.subheader("🎭 ペルソナ管理")
 
     # --- DEBUG（Tab2内でのみ表示） ---
@@ -839,6 +1330,7 @@ with tab2:
     # --- 安全策：最低限の初期化（空白画面回避） ---
     if "personas" not in st.session_state:
         st.session_state.personas = []
+        bump_personas_version()
     if "personas_sha" not in st.session_state:
         st.session_state.personas_sha = ""
 
@@ -862,6 +1354,7 @@ with tab2:
                     if st.button("🗑 削除", key=f"delete_persona_{idx}", use_container_width=True):
                         deleting_name = p.name
                         st.session_state.personas.pop(idx)
+                        bump_personas_version()
 
                         # 選択中ペルソナが消えたら退避
                         if st.session_state.personas:
@@ -904,6 +1397,7 @@ with tab2:
                     goals=(goals or "").strip(),
                 )
                 st.session_state.personas.append(new_p)
+                bump_personas_version()
                 st.session_state.selected_persona_name = new_p.name
 
                 # ★自動保存（GitHub）
@@ -920,19 +1414,26 @@ with tab2:
 # =========================================================
 # Tab3: Threads連携（認可URL → code入力 → token → 投稿）
 # =========================================================
-with tab3:
+@st.fragment
+def render_threads_tab():
     st.subheader("🔗 Threads連携")
     st.caption("Community Cloud では自動でブラウザを開きにくいので、認可URL表示→code貼り付け方式にしています。")
 
     if not threads_app_id or not threads_app_secret:
         st.warning("サイドバーで Threads App ID / Secret を入力してください。")
     else:
-        # まだ client が無ければ作成
-        if st.session_state.threads_client is None:
+        # client が無い／App ID・Secret が変わったときだけ作成
+        # （認可後はユーザーのトークンを持つので cache_resource で全セッション共有にはしない）
+        creds = (threads_app_id, threads_app_secret)
+        if st.session_state.threads_client is None or st.session_state.get("threads_client_creds") != creds:
+            from threads_api import ThreadsAPIClient
+
             st.session_state.threads_client = ThreadsAPIClient(
                 app_id=threads_app_id,
                 app_secret=threads_app_secret,
+                session=http_session(),
             )
+            st.session_state.threads_client_creds = creds
 
         client: ThreadsAPIClient = st.session_state.threads_client
 
@@ -982,10 +1483,24 @@ with tab3:
 # =========================================================
 # Tab4: 分析（プレースホルダ）
 # =========================================================
-with tab4:
+@st.fragment
+def render_analytics_tab():
     st.subheader("📊 分析")
-    st.info("分析タブは現在プレースホルダです。今後、投稿の反応（views/likes/replies等）を取得して可視化します。")
+    st.info("分析ページは現在プレースホルダです。今後、投稿の反応（views/likes/replies等）を取得して可視化します。")
 
     st.markdown("#### 参考: threads_api.py の insights 取得")
     st.caption("threads_api.py には get_insights が実装されています（トークン取得後に post_id を指定）。")
-    st.caption("必要なら、このタブに post_id 入力→get_insights 表示を追加できます。")
+    st.caption("必要なら、このページに post_id 入力→get_insights 表示を追加できます。")
+
+
+# -------------------------
+# Pages（選択中のページだけ描画する）
+# -------------------------
+PAGES = dict(zip(PAGE_LABELS, (
+    render_post_tab,
+    render_persona_tab,
+    render_threads_tab,
+    render_analytics_tab,
+)))
+
+PAGES[page]()
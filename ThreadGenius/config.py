@@ -3,9 +3,10 @@
 
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from types import MappingProxyType
+from typing import ClassVar, List, Mapping, Optional
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PersonaConfig:
     """ペルソナ設定"""
     name: str
@@ -15,7 +16,7 @@ class PersonaConfig:
     target_audience: str  # ターゲットオーディエンス
     goals: str  # 目標
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ThreadsAlgorithmRules:
     """2026年最新Threadsアルゴリズムルール"""
     max_chars: int = 500
@@ -24,14 +25,14 @@ class ThreadsAlgorithmRules:
     engagement_priority: str = "リプライ > いいね"
     
     # 4段階ステージ
-    stages = {
+    stages: ClassVar[Mapping[str, str]] = MappingProxyType({
         "Stage1": "初期配信（フォロワーの一部）- 初速の反応",
         "Stage2": "拡大配信（フォロワー全体）- 反応の持続性",
         "Stage3": "発見・おすすめ（フォロワー外）- トレンドとの関連性",
         "Stage4": "広範囲拡散（Instagram等外部）- シェア価値"
-    }
+    })
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PostTemplate:
     """投稿テンプレート構造"""
     hook: str  # 冒頭：興味を引く
@@ -67,6 +68,28 @@ DEFAULT_PERSONAS = [
     )
 ]
 
+# 既存ニューステンプレ（最低限のサンプル：必要なら後で増やせます）
+PRESET_NEWS_TEMPLATES = {
+    "（選択なし）": "",
+    "✅ 完成版｜起業家（申込）発信量より順番": "SNSで頑張ってるのに、申込が増えない人へ。\n原因は「発信量」より、申込までの“順番”が詰まってることが多いです。\n\nあなたのボトルネックはどれ？（番号でOK）\n1 導線\n2 LP\n3 オファー\n4 信頼\n5 計測",
+    "✅ 完成版｜店舗（新規）見つけてもらえない": "新規が増えない店舗へ。\n原因は「投稿が少ない」より、見つけてもらう入口が弱いことが多いです。\n\nどこが弱い？（番号でOK）\n1 Googleマップ\n2 検索\n3 SNS\n4 写真\n5 初回不安の解消",
+}
+
+# 既存テンプレからカテゴリ→ペルソナ自動切替（簡易）
+PRESET_TO_CATEGORY = {
+    "✅ 完成版｜起業家（申込）発信量より順番": "ビジネス",
+    "✅ 完成版｜店舗（新規）見つけてもらえない": "店舗",
+}
+
+# テーマ → 強制タグ（選択肢の並びと index はここで1回だけ作る）
+TOPIC_THEME_TO_TAG = {
+    "Web集客": "#Web集客",
+    "マーケティング": "#マーケティング",
+    "店舗集客": "#店舗集客",
+}
+TOPIC_THEME_KEYS = tuple(TOPIC_THEME_TO_TAG)
+TOPIC_THEME_TO_IDX = {k: i for i, k in enumerate(TOPIC_THEME_KEYS)}
+
 # API設定
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 THREADS_APP_ID = os.getenv("THREADS_APP_ID", "")
@@ -79,11 +102,11 @@ DEFAULT_RSS_FEEDS = [
     # ユーザーが追加可能
 ]
 
-# スコアリング重み設定
-SCORING_WEIGHTS = {
+# スコアリング重み設定（読み取り専用）
+SCORING_WEIGHTS: Mapping[str, float] = MappingProxyType({
     "conversation_trigger": 0.30,  # 会話誘発度
     "trend_relevance": 0.25,       # トレンド適合性
     "emotional_impact": 0.20,       # 感情的インパクト
     "value_provided": 0.15,         # 提供価値
     "stage1_potential": 0.10        # Stage1突破ポテンシャル
-}
+})
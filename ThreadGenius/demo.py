@@ -3,65 +3,80 @@ ThreadGenius デモ実行スクリプト
 APIキーなしでも動作確認できるデモモード
 """
 
-from config import PersonaConfig, DEFAULT_PERSONAS, DEFAULT_RSS_FEEDS
-from news_collector import NewsCollector
+import sys
+
+from config import PersonaConfig, DEFAULT_PERSONAS, DEFAULT_RSS_FEEDS, SCORING_WEIGHTS
 
 def demo_persona():
     """ペルソナのデモ"""
-    print("=" * 60)
-    print("🎭 ThreadGenius - ペルソナシステムデモ")
-    print("=" * 60)
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("🎭 ThreadGenius - ペルソナシステムデモ")
+    lines.append("=" * 60)
+    lines.append("")
     
     for i, persona in enumerate(DEFAULT_PERSONAS, 1):
-        print(f"【ペルソナ {i}】")
-        print(f"名前: {persona.name}")
-        print(f"専門分野: {persona.specialty}")
-        print(f"口調: {persona.tone}")
-        print(f"価値観: {persona.values}")
-        print(f"ターゲット: {persona.target_audience}")
-        print(f"目標: {persona.goals}")
-        print()
+        lines.append(f"【ペルソナ {i}】")
+        lines.append(f"名前: {persona.name}")
+        lines.append(f"専門分野: {persona.specialty}")
+        lines.append(f"口調: {persona.tone}")
+        lines.append(f"価値観: {persona.values}")
+        lines.append(f"ターゲット: {persona.target_audience}")
+        lines.append(f"目標: {persona.goals}")
+        lines.append("")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_news_collection():
     """ニュース収集のデモ"""
-    print("=" * 60)
-    print("📰 ThreadGenius - ニュース収集デモ")
-    print("=" * 60)
-    print()
-    
-    print("RSSフィードから最新ニュースを取得中...")
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("📰 ThreadGenius - ニュース収集デモ")
+    lines.append("=" * 60)
+    lines.append("")
     
+    lines.append("RSSフィードから最新ニュースを取得中...")
+    lines.append("")
+    # 取得中の表示は通信前に出しておく
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+    lines = []
+
+    # feedparser / requests の読み込みはニュース収集デモを選んだときだけ
+    from news_collector import NewsCollector
+
     collector = NewsCollector(DEFAULT_RSS_FEEDS)
     
     try:
         news_items = collector.collect_news(limit=3)
         
         if news_items:
-            print(f"✅ {len(news_items)}件のニュースを取得しました！\n")
+            lines.append(f"✅ {len(news_items)}件のニュースを取得しました！\n")
             
             for i, news in enumerate(news_items, 1):
-                print(f"【ニュース {i}】")
-                print(f"タイトル: {news['title']}")
-                print(f"概要: {news['summary'][:100]}...")
-                print(f"リンク: {news['link']}")
-                print()
+                lines.append(f"【ニュース {i}】")
+                lines.append(f"タイトル: {news['title']}")
+                lines.append(f"概要: {news['summary_preview']}...")
+                lines.append(f"リンク: {news['link']}")
+                lines.append("")
         else:
-            print("⚠️ ニュースが取得できませんでした")
-            print("（ネットワーク接続を確認してください）")
+            lines.append("⚠️ ニュースが取得できませんでした")
+            lines.append("（ネットワーク接続を確認してください）")
     
     except Exception as e:
-        print(f"❌ エラー: {e}")
+        lines.append(f"❌ エラー: {e}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_post_template():
     """投稿テンプレートのデモ"""
-    print("=" * 60)
-    print("📝 ThreadGenius - 投稿テンプレートデモ")
-    print("=" * 60)
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("📝 ThreadGenius - 投稿テンプレートデモ")
+    lines.append("=" * 60)
+    lines.append("")
     
-    print("【2026年最新 Threadsアルゴリズム対応投稿構成】\n")
+    lines.append("【2026年最新 Threadsアルゴリズム対応投稿構成】\n")
     
     example_post = """
 🔥 最近AIツールがヤバすぎる件
@@ -81,99 +96,99 @@ SNS投稿も自動生成できる時代。
 #AI活用術
 """
     
-    print("【生成例】")
-    print(example_post.strip())
-    print()
+    lines.append("【生成例】")
+    lines.append(example_post.strip())
+    lines.append("")
     
-    print("【構成分析】")
-    print("✓ 冒頭：「ヤバすぎる」でスクロールを止める")
-    print("✓ 本文：共感（自分らしさが消える）+ 有益情報（8:2の法則）")
-    print("✓ 末尾：質問で会話を誘発")
-    print("✓ トピックタグ：1つのみ (#AI活用術)")
-    print("✓ 文字数：500文字以内")
-    print("✓ 「ツッコミ代」：8:2の比率、賛否両論あり")
-    print()
+    lines.append("【構成分析】")
+    lines.append("✓ 冒頭：「ヤバすぎる」でスクロールを止める")
+    lines.append("✓ 本文：共感（自分らしさが消える）+ 有益情報（8:2の法則）")
+    lines.append("✓ 末尾：質問で会話を誘発")
+    lines.append("✓ トピックタグ：1つのみ (#AI活用術)")
+    lines.append("✓ 文字数：500文字以内")
+    lines.append("✓ 「ツッコミ代」：8:2の比率、賛否両論あり")
+    lines.append("")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_scoring():
     """スコアリングデモ"""
-    print("=" * 60)
-    print("📊 ThreadGenius - スコアリングシステムデモ")
-    print("=" * 60)
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("📊 ThreadGenius - スコアリングシステムデモ")
+    lines.append("=" * 60)
+    lines.append("")
     
-    print("【8種類メトリクス評価】\n")
-    
-    scores = {
-        "会話誘発度": 0.85,
-        "トレンド適合性": 0.75,
-        "感情的インパクト": 0.90,
-        "提供価値": 0.70,
-        "Stage1突破ポテンシャル": 0.80
-    }
-    
-    weights = {
-        "会話誘発度": 30,
-        "トレンド適合性": 25,
-        "感情的インパクト": 20,
-        "提供価値": 15,
-        "Stage1突破ポテンシャル": 10
-    }
-    
-    total_score = 0
-    
-    for metric, score in scores.items():
-        weight = weights[metric]
-        weighted_score = score * weight
-        total_score += weighted_score
-        
-        bar = "█" * int(score * 20)
-        print(f"{metric:20s} [{bar:20s}] {score:.2f} × {weight}% = {weighted_score:.1f}点")
+    lines.append("【8種類メトリクス評価】\n")
+
+    # numpy の読み込みはスコアリングデモを選んだときだけ
+    import numpy as np
+
+    # 表示名・スコアは SCORING_WEIGHTS のキー順に並べる
+    metrics = ["会話誘発度", "トレンド適合性", "感情的インパクト", "提供価値", "Stage1突破ポテンシャル"]
+    scores = np.array([0.85, 0.75, 0.90, 0.70, 0.80])
+    # 重みは config の設定を % 表記で使う
+    weights = np.rint(np.fromiter(SCORING_WEIGHTS.values(), dtype=float) * 100).astype(int)
     
-    print()
-    print(f"【総合スコア】 {total_score:.1f} / 100点")
-    print()
+    # 重み付き合計とバーの長さはまとめて計算
+    weighted_scores = scores * weights
+    total_score = float(scores @ weights)
+    bar_lens = (scores * 20).astype(int)
+    
+    for i, metric in enumerate(metrics):
+        bar = "█" * bar_lens[i]
+        lines.append(f"{metric:20s} [{bar:20s}] {scores[i]:.2f} × {weights[i]}% = {weighted_scores[i]:.1f}点")
+    
+    lines.append("")
+    lines.append(f"【総合スコア】 {total_score:.1f} / 100点")
+    lines.append("")
     
     if total_score >= 80:
-        print("🟢 評価：優秀 - Stage3以上到達の可能性が高い")
+        lines.append("🟢 評価：優秀 - Stage3以上到達の可能性が高い")
     elif total_score >= 60:
-        print("🟡 評価：良好 - Stage2安定到達")
+        lines.append("🟡 評価：良好 - Stage2安定到達")
     else:
-        print("🔴 評価：改善推奨 - Stage1突破が課題")
+        lines.append("🔴 評価：改善推奨 - Stage1突破が課題")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def demo_algorithm_rules():
     """アルゴリズムルールのデモ"""
-    print("=" * 60)
-    print("🎯 ThreadGenius - 2026年最新アルゴリズム")
-    print("=" * 60)
-    print()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("🎯 ThreadGenius - 2026年最新アルゴリズム")
+    lines.append("=" * 60)
+    lines.append("")
     
-    print("【3つの鍵】\n")
-    print("1️⃣  投稿頻度：「いること」をアルゴリズムに知らせる")
-    print("   → 最低1日1回、理想は1日2-5回")
-    print()
-    print("2️⃣  会話の質：「いいね」より「リプライ」が圧倒的に重要")
-    print("   → 質問や意見を求める投稿を設計")
-    print()
-    print("3️⃣  テキスト中心：AIが理解できる投稿")
-    print("   → 画像だけでなく、必ずテキストを添える")
-    print()
+    lines.append("【3つの鍵】\n")
+    lines.append("1️⃣  投稿頻度：「いること」をアルゴリズムに知らせる")
+    lines.append("   → 最低1日1回、理想は1日2-5回")
+    lines.append("")
+    lines.append("2️⃣  会話の質：「いいね」より「リプライ」が圧倒的に重要")
+    lines.append("   → 質問や意見を求める投稿を設計")
+    lines.append("")
+    lines.append("3️⃣  テキスト中心：AIが理解できる投稿")
+    lines.append("   → 画像だけでなく、必ずテキストを添える")
+    lines.append("")
     
-    print("【4段階ステージ評価】\n")
-    print("Stage1: 初期配信（フォロワーの一部）")
-    print("  └─ 評価ポイント：初速の反応")
-    print("  └─ 対策：投稿後1時間はリプライに即返信\n")
+    lines.append("【4段階ステージ評価】\n")
+    lines.append("Stage1: 初期配信（フォロワーの一部）")
+    lines.append("  └─ 評価ポイント：初速の反応")
+    lines.append("  └─ 対策：投稿後1時間はリプライに即返信\n")
     
-    print("Stage2: 拡大配信（フォロワー全体）")
-    print("  └─ 評価ポイント：反応の持続性")
-    print("  └─ 対策：テキストで文脈を補足\n")
+    lines.append("Stage2: 拡大配信（フォロワー全体）")
+    lines.append("  └─ 評価ポイント：反応の持続性")
+    lines.append("  └─ 対策：テキストで文脈を補足\n")
     
-    print("Stage3: 発見・おすすめ（フォロワー外）")
-    print("  └─ 評価ポイント：トレンドとの関連性")
-    print("  └─ 対策：トピックタグを活用\n")
+    lines.append("Stage3: 発見・おすすめ（フォロワー外）")
+    lines.append("  └─ 評価ポイント：トレンドとの関連性")
+    lines.append("  └─ 対策：トピックタグを活用\n")
     
-    print("Stage4: 広範囲拡散（Instagram等外部）")
-    print("  └─ 評価ポイント：シェア価値")
-    print("  └─ 対策：Stage3を安定して超えることを目指す\n")
+    lines.append("Stage4: 広範囲拡散（Instagram等外部）")
+    lines.append("  └─ 評価ポイント：シェア価値")
+    lines.append("  └─ 対策：Stage3を安定して超えることを目指す\n")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """メインのデモ実行"""
@@ -4,15 +4,213 @@ RSSフィードからニュースを自動取得
 """
 
 import feedparser
-from typing import List, Dict, Optional
-from datetime import datetime
+import re
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timezone
+from functools import lru_cache
 import requests
+from cachetools import TTLCache
+from dateutil import parser as date_parser
+from dateutil import tz
+from requests.adapters import HTTPAdapter
+
+# RSS の高速パスは lxml（libxml2）を優先し、無ければ標準の ElementTree を使う
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+# RFC 822 の略号タイムゾーン（dateutil は既定では解釈しない）
+_TZINFOS = {
+    "EST": tz.tzoffset("EST", -5 * 3600),
+    "EDT": tz.tzoffset("EDT", -4 * 3600),
+    "CST": tz.tzoffset("CST", -6 * 3600),
+    "CDT": tz.tzoffset("CDT", -5 * 3600),
+    "MST": tz.tzoffset("MST", -7 * 3600),
+    "MDT": tz.tzoffset("MDT", -6 * 3600),
+    "PST": tz.tzoffset("PST", -8 * 3600),
+    "PDT": tz.tzoffset("PDT", -7 * 3600),
+    "JST": tz.tzoffset("JST", 9 * 3600),
+}
+_MIN_DATETIME = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _sort_key(published: str) -> datetime:
+    """公開日文字列 → 並べ替え用の datetime（RFC 822 / ISO 8601 混在でも正しく比較できる）"""
+    if not published:
+        return _MIN_DATETIME
+    try:
+        dt = date_parser.parse(published, tzinfos=_TZINFOS)
+    except (ValueError, OverflowError):
+        return _MIN_DATETIME
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@lru_cache(maxsize=64)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """キーワード群を1本の正規表現にまとめる（1回の走査でどれかに当たるか判定）"""
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+def _entries_to_news(entries, feed_url: str, keywords: Optional[List[str]] = None) -> List[Dict]:
+    """feedparser のエントリをニュース辞書のリストへ変換"""
+    news_items = []
+    pattern = _keyword_pattern(tuple(keywords)) if keywords else None
+
+    for entry in entries:
+        title = entry.get("title", "")
+        summary = entry.get("summary", "")
+        link = entry.get("link", "")
+        published = entry.get("published", "")
+
+        # キーワードフィルタリング
+        if pattern is not None:
+            if not (pattern.search(title) or pattern.search(summary)):
+                continue
+
+        news_items.append({
+            "title": title,
+            "summary": summary,
+            # 表示・プロンプト用の切り詰めは取り込み時に1回だけ作る
+            "summary_short": summary[:200],
+            "summary_preview": summary[:100],
+            "link": link,
+            "published": published,
+            "_sort_key": _sort_key(published),
+            "source": feed_url
+        })
+
+    return news_items
+
+
+def _local_name(tag: str) -> str:
+    """{namespace}name → name"""
+    return tag.rsplit("}", 1)[-1]
+
+
+# item と、その中で読む子要素（RSS 2.0 は名前空間なし、RSS 1.0 は RSS 1.0 名前空間 + dc:date）
+# media:title や atom:link など他の名前空間の要素は拾わない
+_RSS1_NS = "{http://purl.org/rss/1.0/}"
+_RSS_ITEM_TAGS = ("item", _RSS1_NS + "item")
+_RSS_FIELD_TAGS = {
+    "title": "title",
+    "description": "description",
+    "link": "link",
+    "pubDate": "pubDate",
+    _RSS1_NS + "title": "title",
+    _RSS1_NS + "description": "description",
+    _RSS1_NS + "link": "link",
+    "{http://purl.org/dc/elements/1.1/}date": "date",
+}
+
+
+def _rss_entries(raw: bytes) -> Optional[List[Dict[str, str]]]:
+    """
+    RSS 2.0 / 1.0 の item から必要な4項目だけを iterparse で読む（feedparser より軽い）。
+    Atom や壊れた XML のときは None を返し、feedparser に任せる。
+    """
+    entries = []
+    try:
+        events = ET.iterparse(BytesIO(raw), events=("start", "end"))
+        # ルート要素で RSS かどうかを判定
+        _, root = next(events)
+        if _local_name(root.tag) not in ("rss", "RDF"):
+            return None
+        for event, elem in events:
+            if event != "end" or elem.tag not in _RSS_ITEM_TAGS:
+                continue
+            # 同じ項目が複数あれば最初のものを使う（lxml のコメント等は tag が文字列でないので当たらない）
+            fields = {}
+            for child in elem:
+                name = _RSS_FIELD_TAGS.get(child.tag)
+                if name and name not in fields:
+                    fields[name] = (child.text or "").strip()
+            entries.append({
+                "title": fields.get("title", ""),
+                "summary": fields.get("description", ""),
+                "link": fields.get("link", ""),
+                "published": fields.get("pubDate") or fields.get("date", ""),
+            })
+            # 読み終わった item は捨ててメモリを一定に保つ（lxml では親に残る兄弟も消す）
+            elem.clear()
+            if hasattr(elem, "getprevious"):
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    except (ET.ParseError, StopIteration):
+        return None
+    return entries
+
+
+def _dedupe_by_link(items) -> List[Dict]:
+    """リンク（クエリと末尾の / を除く）が同じニュースを1件にまとめる"""
+    seen = set()
+    unique = []
+    for item in items:
+        key = item.get("link", "").split("?", 1)[0].rstrip("/")
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(item)
+    return unique
+
+
+# フィードごとの取得結果（(url, keywords) → ニュースリスト）を5分間使い回す
+# TTLCache はスレッドセーフではないのでロック越しに触る
+_FEED_CACHE: TTLCache = TTLCache(maxsize=256, ttl=300)
+_FEED_CACHE_LOCK = threading.Lock()
+
+
+def _feed_cache_key(feed_url: str, keywords: Optional[List[str]]) -> Tuple[str, Tuple[str, ...]]:
+    return feed_url, tuple(keywords or ())
+
+
+def _feed_cache_get(key: Tuple[str, Tuple[str, ...]]) -> Optional[List[Dict]]:
+    with _FEED_CACHE_LOCK:
+        items = _FEED_CACHE.get(key)
+    # 呼び出し側が書き換えてもキャッシュが汚れないようコピーを返す
+    return None if items is None else [dict(item) for item in items]
+
+
+def _feed_cache_put(key: Tuple[str, Tuple[str, ...]], items: List[Dict]):
+    with _FEED_CACHE_LOCK:
+        _FEED_CACHE[key] = [dict(item) for item in items]
+
+
+def _fetch_workers(rss_feeds: List[str]) -> int:
+    """並列取得のスレッド数（フィード数まで、最大8）"""
+    return max(1, min(8, len(rss_feeds)))
+
+
+def _new_feed_session() -> requests.Session:
+    """フィード取得用のセッション（接続を使い回す／UA は feedparser と同じ）"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = feedparser.USER_AGENT
+    return session
+
 
 class NewsCollector:
     """ニュース自動収集"""
     
     def __init__(self, rss_feeds: List[str]):
         self.rss_feeds = rss_feeds
+        self._session = _new_feed_session()
+        # 条件付きGET用（304 のときは前回の本文を使い回す）
+        self._lock = threading.Lock()
+        self._etags: Dict[str, str] = {}
+        self._lastmod: Dict[str, str] = {}
+        self._bodies: Dict[str, Tuple[bytes, Dict[str, str]]] = {}
+        # fetch_feed 用：(url, keywords) → (パースした本文, 結果)。304 なら再パースしない
+        self._parsed: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[bytes, Dict[str, str]], List[Dict]]] = {}
         
     def collect_news(self, limit: int = 10, keywords: Optional[List[str]] = None) -> List[Dict]:
         """
@@ -25,49 +223,117 @@ class NewsCollector:
         Returns:
             ニュースリスト
         """
-        all_news = []
-        
+        per_feed: Dict[str, List[Dict]] = {}
+
+        # 5分以内に取得済みのフィードはキャッシュから
+        stale = []
         for feed_url in self.rss_feeds:
+            cached = _feed_cache_get(_feed_cache_key(feed_url, keywords))
+            if cached is None:
+                stale.append(feed_url)
+            else:
+                per_feed[feed_url] = cached
+
+        # ダウンロード（ネットワーク待ち）だけ並列に行い、パース（CPU）は1件ずつ順に行う
+        with ThreadPoolExecutor(max_workers=_fetch_workers(stale)) as executor:
+            downloads = list(executor.map(self._download_one, stale))
+
+        for feed_url, download in zip(stale, downloads):
+            if download is None:
+                continue
             try:
-                news_items = self._fetch_from_feed(feed_url, keywords)
-                all_news.extend(news_items)
+                news_items = self._parse_feed(*download, feed_url, keywords)
             except Exception as e:
-                print(f"フィード取得エラー [{feed_url}]: {e}")
+                print(f"フィード解析エラー [{feed_url}]: {e}")
                 continue
+            _feed_cache_put(_feed_cache_key(feed_url, keywords), news_items)
+            per_feed[feed_url] = news_items
+
+        # 複数フィードに転載された同じ記事は、フィード順で先に出たものだけ残す
+        all_news = _dedupe_by_link(
+            item for feed_url in self.rss_feeds for item in per_feed.get(feed_url, ())
+        )
         
         # 日付順にソート
-        all_news.sort(key=lambda x: x.get("published", ""), reverse=True)
+        all_news.sort(key=lambda x: x.get("_sort_key", _MIN_DATETIME), reverse=True)
         
         return all_news[:limit]
     
-    def _fetch_from_feed(self, feed_url: str, keywords: Optional[List[str]] = None) -> List[Dict]:
-        """個別のRSSフィードから取得"""
-        
-        feed = feedparser.parse(feed_url)
-        
-        news_items = []
-        
-        for entry in feed.entries:
-            title = entry.get("title", "")
-            summary = entry.get("summary", "")
-            link = entry.get("link", "")
-            published = entry.get("published", "")
-            
-            # キーワードフィルタリング
-            if keywords:
-                if not any(kw in title or kw in summary for kw in keywords):
-                    continue
-            
-            news_items.append({
-                "title": title,
-                "summary": summary,
-                "link": link,
-                "published": published,
-                "source": feed_url
-            })
-        
-        return news_items
-    
+    def _download_one(self, feed_url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """1フィード分の本文をダウンロード（失敗したら None で続行）"""
+        headers = {}
+        with self._lock:
+            if feed_url in self._bodies:
+                if feed_url in self._etags:
+                    headers["If-None-Match"] = self._etags[feed_url]
+                if feed_url in self._lastmod:
+                    headers["If-Modified-Since"] = self._lastmod[feed_url]
+        try:
+            r = self._session.get(feed_url, headers=headers, timeout=10)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            print(f"フィード取得エラー [{feed_url}]: {e}")
+            return None
+
+        with self._lock:
+            # 未更新（304）なら前回の本文をそのまま使う
+            if r.status_code == 304 and feed_url in self._bodies:
+                return self._bodies[feed_url]
+
+            download = r.content, {"content-type": r.headers.get("Content-Type", "")}
+            self._bodies[feed_url] = download
+            if r.headers.get("ETag"):
+                self._etags[feed_url] = r.headers["ETag"]
+            if r.headers.get("Last-Modified"):
+                self._lastmod[feed_url] = r.headers["Last-Modified"]
+            return download
+
+    def _parse_feed(
+        self,
+        raw: bytes,
+        response_headers: Dict[str, str],
+        feed_url: str,
+        keywords: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """ダウンロード済みの本文をパース（RSS は ElementTree、それ以外は feedparser）"""
+        entries = _rss_entries(raw)
+        if entries is None:
+            # 文字コード判定のため Content-Type も渡す
+            feed = feedparser.parse(raw, response_headers=response_headers)
+            # 壊れていて1件も読めないときは空の結果として扱わずエラーにする
+            if feed.bozo and not feed.entries:
+                raise ValueError(feed.get("bozo_exception") or "フィードを解析できません")
+            entries = feed.entries
+        return _entries_to_news(entries, feed_url, keywords)
+
+    def fetch_feed(self, feed_url: str, keywords: Optional[List[str]] = None) -> Optional[List[Dict]]:
+        """
+        1フィードを取得してパース（タイムアウト付き・条件付きGET、5分キャッシュは使わない）。
+        通信エラー・2xx/304 以外は None、解析できないときは例外。
+        """
+        download = self._download_one(feed_url)
+        if download is None:
+            return None
+
+        key = _feed_cache_key(feed_url, keywords)
+        with self._lock:
+            previous = self._parsed.get(key)
+        # 未更新（304）なら前回のパース結果を使う
+        if previous is not None and previous[0] is download:
+            return [dict(item) for item in previous[1]]
+
+        news_items = self._parse_feed(*download, feed_url, keywords)
+        with self._lock:
+            self._parsed[key] = (download, news_items)
+        return [dict(item) for item in news_items]
+
+    def invalidate(self):
+        """このフィード集合の5分キャッシュを捨てる（次の collect_news で取り直す）"""
+        feeds = set(self.rss_feeds)
+        with _FEED_CACHE_LOCK:
+            for key in [key for key in _FEED_CACHE if key[0] in feeds]:
+                del _FEED_CACHE[key]
+
     def get_trending_topics(self) -> List[str]:
         """
         トレンドトピックを取得（簡易実装）
@@ -91,7 +357,75 @@ class NewsCollector:
         return f"""
 【ニュース】
 タイトル: {news_item['title']}
-概要: {news_item['summary'][:200]}
+概要: {news_item['summary_short']}
 ソース: {news_item['link']}
 公開日: {news_item.get('published', '不明')}
 """
+
+
+class NewsPoller:
+    """
+    RSSフィードをバックグラウンドで定期取得し、メモリ上に保持する
+    取得は NewsCollector 経由（タイムアウト付き・ETag / Last-Modified の条件付きGET）
+    """
+
+    def __init__(self, rss_feeds: List[str], interval: float = 300.0):
+        self.rss_feeds = list(rss_feeds)
+        self.interval = interval
+
+        self._collector = NewsCollector(self.rss_feeds)
+        self._lock = threading.Lock()
+        self._items: Dict[str, List[Dict]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "NewsPoller":
+        """ポーリング用のデーモンスレッドを開始（二重起動はしない）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """ポーリングを止める（実行中の1周が終わったらスレッドが抜ける）"""
+        self._stop.set()
+
+    def refresh(self, timeout: Optional[float] = None) -> bool:
+        """
+        全フィードを1回ポーリング（フィードごとに並列）。
+        timeout 秒で待つのをやめる（残りは裏で続けて終わり次第反映）。全部終わったら True。
+        """
+        executor = ThreadPoolExecutor(max_workers=_fetch_workers(self.rss_feeds))
+        futures = [executor.submit(self._poll_one, feed_url) for feed_url in self.rss_feeds]
+        executor.shutdown(wait=False)
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def _poll_one(self, feed_url: str):
+        try:
+            self._poll_feed(feed_url)
+        except Exception as e:
+            print(f"フィード取得エラー [{feed_url}]: {e}")
+
+    def snapshot(self, limit: int = 10) -> List[Dict]:
+        """保持しているニュースを日付順で返す（ネットワークアクセスなし）"""
+        with self._lock:
+            all_news = _dedupe_by_link(item for items in self._items.values() for item in items)
+
+        all_news.sort(key=lambda x: x.get("_sort_key", _MIN_DATETIME), reverse=True)
+
+        return [dict(item) for item in all_news[:limit]]
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def _poll_feed(self, feed_url: str):
+        # 通信エラー・2xx/304 以外は None、解析できないときは例外（どちらも保持中のものを残す）
+        news_items = self._collector.fetch_feed(feed_url)
+        if news_items is None:
+            return
+
+        with self._lock:
+            self._items[feed_url] = news_items
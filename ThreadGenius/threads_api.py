@@ -4,18 +4,40 @@ OAuth認証と投稿機能
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import webbrowser
+from urllib.parse import urlencode
+
+# OAuth で要求する権限
+SCOPES = (
+    "threads_basic",
+    "threads_content_publish",
+    "threads_manage_insights",
+    "threads_manage_replies",
+)
 
 class ThreadsAPIClient:
     """Threads API クライアント"""
     
-    def __init__(self, app_id: str, app_secret: str, redirect_uri: str = "https://localhost:8000/callback"):
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        redirect_uri: str = "https://localhost:8000/callback",
+        session: Optional[requests.Session] = None,
+    ):
         self.app_id = app_id
         self.app_secret = app_secret
         self.redirect_uri = redirect_uri
+        # HTTP接続を使い回す（外部から共有セッションを渡せる）
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+        self.session = session
         self.access_token = None
         self.user_id = None
         
@@ -23,26 +45,19 @@ class ThreadsAPIClient:
         self.base_url = "https://graph.threads.net"
         self.auth_url = "https://threads.net/oauth/authorize"
         self.token_url = "https://graph.threads.net/oauth/access_token"
-        
-    def get_authorization_url(self) -> str:
-        """OAuth認証URLを生成"""
-        
-        scopes = [
-            "threads_basic",
-            "threads_content_publish",
-            "threads_manage_insights",
-            "threads_manage_replies"
-        ]
-        
+
+        # 認証URLは入力が固定なので一度だけ組み立てる（redirect_uri もエンコードする）
         params = {
-            "client_id": self.app_id,
-            "redirect_uri": self.redirect_uri,
-            "scope": ",".join(scopes),
+            "client_id": app_id,
+            "redirect_uri": redirect_uri,
+            "scope": ",".join(SCOPES),
             "response_type": "code"
         }
+        self._authorization_url = f"{self.auth_url}?{urlencode(params, safe=',')}"
         
-        url = f"{self.auth_url}?" + "&".join([f"{k}={v}" for k, v in params.items()])
-        return url
+    def get_authorization_url(self) -> str:
+        """OAuth認証URLを生成"""
+        return self._authorization_url
     
     def start_oauth_flow(self):
         """OAuth認証フローを開始"""
@@ -51,8 +66,11 @@ class ThreadsAPIClient:
         print(auth_url)
         print("\n認証後、リダイレクトされたURLの 'code=' パラメータをコピーしてください。\n")
         
-        # ブラウザで開く
-        webbrowser.open(auth_url)
+        # ブラウザで開く（xdg-open 等の待ちでプロンプトを止めない）
+        import threading
+        import webbrowser
+
+        threading.Thread(target=webbrowser.open, args=(auth_url,), daemon=True).start()
         
     def exchange_code_for_token(self, code: str) -> bool:
         """認証コードをアクセストークンに交換"""
@@ -66,7 +84,7 @@ class ThreadsAPIClient:
         }
         
         try:
-            response = requests.post(self.token_url, data=params)
+            response = self.session.post(self.token_url, data=params)
             response.raise_for_status()
             
             data = response.json()
@@ -96,7 +114,7 @@ class ThreadsAPIClient:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -123,9 +141,10 @@ class ThreadsAPIClient:
             print("❌ 認証が必要です。先にOAuth認証を完了してください。")
             return None
         
-        # 文字数チェック
-        if len(text) > 500:
-            print(f"⚠️ 警告：投稿が500文字を超えています（{len(text)}文字）。切り詰めます。")
+        # 文字数チェック（500文字以内ならそのまま使う）
+        n_chars = len(text)
+        if n_chars > 500:
+            print(f"⚠️ 警告：投稿が500文字を超えています（{n_chars}文字）。切り詰めます。")
             text = text[:500]
         
         # Step 1: メディアコンテナを作成
@@ -139,6 +158,18 @@ class ThreadsAPIClient:
         result = self._publish_media_container(container_id)
         
         return result
+
+    def create_posts(self, texts: List[str], media_type: str = "TEXT") -> List[Optional[Dict]]:
+        """
+        複数の投稿をまとめて公開（共有セッション上で最大4件ずつ並列）
+
+        Returns:
+            texts と同じ順の投稿結果（失敗した投稿は None）
+        """
+        if not texts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(4, len(texts))) as executor:
+            return list(executor.map(lambda text: self.create_post(text, media_type), texts))
     
     def _create_media_container(self, text: str, media_type: str) -> Optional[str]:
         """メディアコンテナを作成"""
@@ -152,7 +183,7 @@ class ThreadsAPIClient:
         }
         
         try:
-            response = requests.post(url, data=data)
+            response = self.session.post(url, data=data)
             response.raise_for_status()
             
             result = response.json()
@@ -178,7 +209,7 @@ class ThreadsAPIClient:
         }
         
         try:
-            response = requests.post(url, data=data)
+            response = self.session.post(url, data=data)
             response.raise_for_status()
             
             result = response.json()
@@ -225,7 +256,7 @@ class ThreadsAPIClient:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
             
             return response.json()
@@ -233,3 +264,15 @@ class ThreadsAPIClient:
         except Exception as e:
             print(f"インサイト取得エラー: {e}")
             return None
+
+    def close(self):
+        """自前で作ったセッションを閉じる（外から渡された共有セッションは閉じない）"""
+        if getattr(self, "_owns_session", False):
+            self.session.close()
+            self._owns_session = False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass